@@ -0,0 +1,84 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is used instead
+    orjson = None
+
+# Chromium flags shared by the testers in this directory
+BASE_ARGS = (
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled'
+)
+
+ANTI_DETECT_ARGS = BASE_ARGS + (
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-gpu',
+    '--mute-audio'
+)
+
+# Base flags plus browser subsystems a fingerprint run never uses
+TRIMMED_ARGS = BASE_ARGS + (
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-sync',
+    '--disable-default-apps'
+)
+
+# Page-side helper prepended to the init scripts with canvas noise hooks.
+# getRandomValues is capped at 65536 bytes per call, so larger buffers are
+# filled in chunks
+RANDOM_BYTES_JS = """
+    const randomBytes = n => {
+        const bytes = new Uint8Array(n);
+        for (let offset = 0; offset < n; offset += 65536) {
+            crypto.getRandomValues(bytes.subarray(offset, offset + 65536));
+        }
+        return bytes;
+    };
+"""
+
+# Shared compact encoder for every JSON payload, used when orjson is missing
+_JENC = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+def _dumps(obj):
+    """Serialize obj to compact JSON, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return _JENC.encode(obj)
+
+async def apply_emulation(context, page, user_agent, language, platform, timezone, width, height, scale=1):
+    """Emulate browser-level fingerprint settings on a page of a pooled context; returns its CDP session"""
+    # Pooled contexts are created without per-combination options, so the
+    # same overrides Playwright would apply are sent per page over CDP
+    cdp = await context.new_cdp_session(page)
+    await cdp.send('Emulation.setUserAgentOverride', {
+        'userAgent': user_agent,
+        'acceptLanguage': language,
+        'platform': platform
+    })
+    await cdp.send('Emulation.setLocaleOverride', {'locale': language.split(',')[0]})
+    await cdp.send('Emulation.setTimezoneOverride', {'timezoneId': timezone})
+    await cdp.send('Emulation.setDeviceMetricsOverride', {
+        'width': width,
+        'height': height,
+        'deviceScaleFactor': scale,
+        'mobile': False
+    })
+    return cdp
+
+async def reset_context(context, origins):
+    """Clear cookies and all per-origin storage so a pooled context starts the next combination clean"""
+    await context.clear_cookies()
+    # localStorage, sessionStorage and IndexedDB would otherwise let a site
+    # recognise the previous combination as a returning visitor
+    page = await context.new_page()
+    try:
+        cdp = await context.new_cdp_session(page)
+        for origin in origins:
+            await cdp.send('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+    finally:
+        await page.close()
@@ -1,16 +1,257 @@
 import asyncio
+import base64
+import functools
+import heapq
+import io
 import random
 import csv
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from operator import itemgetter
 from pathlib import Path
+from urllib.parse import urlparse
 from playwright.async_api import async_playwright
+from _launch import ANTI_DETECT_ARGS, RANDOM_BYTES_JS, _dumps, apply_emulation, reset_context
 import itertools
 from datetime import datetime
 import time
 import re
+import struct
+import sys
+
+
+# Loaded flash plugins keyed by _plugin_key, filled in by load_data_files
+_PLUGINS_BY_NAME = {}
+
+@dataclass(slots=True)
+class ComboResult:
+    """Outcome of testing one combination on every site"""
+    combination_id: int
+    timestamp: str
+    is_unique: bool
+    best_uniqueness_score: float
+    average_uniqueness: float
+    test_results: dict
+    fingerprint_config: dict
+
+
+class RateLimiter:
+    """Token bucket pacing requests to one host, one token per interval plus jitter"""
+    
+    def __init__(self, interval=2.0, capacity=1, jitter=0.5):
+        self.interval = interval
+        self.capacity = capacity
+        self.jitter = jitter
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) / self.interval)
+        self._updated = now
+    
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * self.interval + random.uniform(0, self.jitter))
+                self._refill()
+            self._tokens -= 1
+
+
+_UNIQUE_FIELDNAMES = (
+    'combination_id', 'timestamp', 'is_unique', 'best_uniqueness_score',
+    'average_uniqueness', 'user_agent', 'screen_resolution', 'timezone',
+    'language', 'platform', 'flash_language', 'flash_platform', 'fonts_count',
+    'webgl_vendor', 'webgl_renderer', 'hardware_concurrency', 'device_memory',
+    'color_depth', 'pixel_ratio', 'max_touch_points', 'flash_plugins_count',
+    'test_results_ref'
+)
+
+_BEST_HEADER = (
+    b'rank,combination_id,average_uniqueness,best_uniqueness_score,'
+    b'user_agent,screen_resolution,timezone,language,platform,'
+    b'webgl_vendor,webgl_renderer,hardware_concurrency,device_memory,'
+    b'fonts_list,full_config_json\r\n'
+)
+
+# Fetch the per-row config fields with one C-level call instead of a lookup per key
+_get_cfg = itemgetter(
+    'user_agent', 'screen_resolution', 'timezone', 'language', 'platform',
+    'flash_language', 'flash_platform', 'webgl_vendor', 'webgl_renderer',
+    'hardware_concurrency', 'device_memory', 'color_depth', 'pixel_ratio',
+    'max_touch_points'
+)
+
+
+def _plugin_key(plugin):
+    """Identify a plugin; filenames alone repeat across Flash versions"""
+    return (plugin.get('filename'), plugin.get('version'))
+
+
+@functools.lru_cache(maxsize=32)
+def _plugins_json(key_tuple):
+    """JSON-encode a plugin subset given its sorted plugin keys"""
+    return _dumps([_PLUGINS_BY_NAME[key] for key in key_tuple])
+
+
+# Fingerprint spoofing hooks shared by every combination. All values are read
+# from window.__fp, which test_advanced_combination installs per page, and
+# window.__fontPool, which load_data_files prepends once.
+_STATIC_INIT_SCRIPT = RANDOM_BYTES_JS + """
+    // Platform override
+    Object.defineProperty(navigator, 'platform', {
+        get: () => window.__fp.platform
+    });
+    
+    // Hardware specs
+    Object.defineProperty(navigator, 'hardwareConcurrency', {
+        get: () => window.__fp.hardwareConcurrency
+    });
+    
+    Object.defineProperty(navigator, 'deviceMemory', {
+        get: () => window.__fp.deviceMemory
+    });
+    
+    Object.defineProperty(navigator, 'maxTouchPoints', {
+        get: () => window.__fp.maxTouchPoints
+    });
+    
+    // Screen properties
+    Object.defineProperty(screen, 'colorDepth', {
+        get: () => window.__fp.colorDepth
+    });
+    
+    Object.defineProperty(screen, 'pixelDepth', {
+        get: () => window.__fp.colorDepth
+    });
+    
+    // Dynamic Flash plugins simulation
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => (window.__fp.plugins || []).map(plugin => ({
+            name: plugin.name,
+            description: plugin.description,
+            filename: plugin.filename,
+            version: plugin.version,
+            length: plugin.mimeTypes ? plugin.mimeTypes.length : 1
+        }))
+    });
+
+    // Flash language and platform
+    Object.defineProperty(window, 'flashLanguage', {
+        get: () => window.__fp.flashLanguage
+    });
+    Object.defineProperty(window, 'flashPlatform', {
+        get: () => window.__fp.flashPlatform
+    });
+
+    // Font detection spoofing; fonts arrive as base64 Uint16 pool indices
+    let availableFonts = null;
+    const decodeFonts = () => {
+        const bytes = Uint8Array.from(atob(window.__fp.fontIdx || ''), c => c.charCodeAt(0));
+        return Array.from(new Uint16Array(bytes.buffer), i => window.__fontPool[i]);
+    };
+    const originalMeasureText = CanvasRenderingContext2D.prototype.measureText;
+    CanvasRenderingContext2D.prototype.measureText = function(text) {
+        // Simulate different font metrics based on available fonts
+        const result = originalMeasureText.call(this, text);
+        availableFonts = availableFonts || decodeFonts();
+        if (this.font && !availableFonts.some(font => this.font.includes(font))) {
+            // Slightly modify metrics for unavailable fonts
+            result.width *= 0.95 + Math.random() * 0.1;
+        }
+        return result;
+    };
+    
+    // WebGL fingerprinting with custom vendor/renderer
+    const getParameter = WebGLRenderingContext.prototype.getParameter;
+    WebGLRenderingContext.prototype.getParameter = function(parameter) {
+        if (parameter === 37445) { // UNMASKED_VENDOR_WEBGL
+            return window.__fp.webglVendor;
+        }
+        if (parameter === 37446) { // UNMASKED_RENDERER_WEBGL
+            return window.__fp.webglRenderer;
+        }
+        return getParameter.call(this, parameter);
+    };
+    
+    // Canvas fingerprinting with controlled noise
+    const getContext = HTMLCanvasElement.prototype.getContext;
+    HTMLCanvasElement.prototype.getContext = function(type) {
+        const context = getContext.call(this, type);
+        if (type === '2d') {
+            const getImageData = context.getImageData;
+            context.getImageData = function(...args) {
+                const imageData = getImageData.apply(this, args);
+                // Add controlled noise based on canvas_noise level
+                const noiseLevel = window.__fp.canvasNoise;
+                const half = noiseLevel >> 1;
+                const data = imageData.data;
+                const noise = randomBytes(data.length);
+                // Uint8ClampedArray clamps to 0-255 on assignment; skip alpha
+                for (let i = 0; i < data.length; i++) {
+                    if ((i & 3) !== 3) {
+                        data[i] = data[i] + (noise[i] % noiseLevel) - half;
+                    }
+                }
+                return imageData;
+            };
+        }
+        return context;
+    };
+    
+    // Audio context fingerprinting noise
+    const AudioContext = window.AudioContext || window.webkitAudioContext;
+    if (AudioContext) {
+        const originalCreateOscillator = AudioContext.prototype.createOscillator;
+        AudioContext.prototype.createOscillator = function() {
+            const oscillator = originalCreateOscillator.call(this);
+            const originalFrequency = oscillator.frequency;
+            // Add slight frequency variation
+            Object.defineProperty(oscillator, 'frequency', {
+                get: () => {
+                    const variation = 1 + (Math.random() - 0.5) * 0.0001;
+                    return originalFrequency.value * variation;
+                }
+            });
+            return oscillator;
+        };
+    }
+    
+    // Override Date timezone for consistency
+    const originalDate = Date;
+    Date = function(...args) {
+        if (args.length === 0) {
+            return new originalDate();
+        }
+        return new originalDate(...args);
+    };
+    Date.prototype = originalDate.prototype;
+    
+    // Battery API spoofing (if available)
+    if (navigator.getBattery) {
+        navigator.getBattery = async () => ({ ...window.__fp.battery });
+    }
+"""
+
 
 class AdvancedFingerprintTester:
-    def __init__(self):
+    # Uniqueness keywords counted by extract_generic_data
+    _UNIQ_RE = re.compile(r'unique|identifiable|fingerprint|one in|bits of information', re.IGNORECASE)
+
+    # Common values per weighted category and the chance of drawing one of them;
+    # everything else is drawn from the uncommon remainder for uniqueness
+    WEIGHTED_CATEGORIES = {
+        'screen_resolutions': (['1920x1080', '1366x768', '1280x720', '1536x864'], 0.2),
+        'timezones': (['America/New_York', 'Europe/London', 'America/Los_Angeles', 'UTC'], 0.15),
+        'languages': (['en-US,en;q=0.9', 'en-GB,en;q=0.9', 'en,en-US;q=0.9'], 0.1),
+    }
+
+    def __init__(self, csv_buffering=1024 * 1024):
         self.data_files = {
             'user_agents': 'user_agents.txt',
             'screen_resolutions': 'screen_resolutions.txt',
@@ -24,7 +265,40 @@ class AdvancedFingerprintTester:
             'webgl_vendor_renderer': 'webgl_vendor_renderer.txt'
         }
         self.combinations = []
+        # Write buffer for result files; rows are only flushed when it fills
+        self.csv_buffering = csv_buffering
+        self._plugin_indices = []
+        self._webgl_vendors = ()
+        self._webgl_renderers = ()
+        self._static_init_script = _STATIC_INIT_SCRIPT
+        self._font_index = {}
+        self._weighted_tables = {}
+        self._log_q = None
+        self._result_q = None
+        self._host_limiters = {}
+    
+    
+    def _log(self, line):
+        """Queue a progress line for the log drainer, or print it outside a run"""
+        if self._log_q is None:
+            print(line)
+        else:
+            self._log_q.put_nowait(line)
     
+    async def _log_drainer(self):
+        """Write queued log lines in batches until a None sentinel arrives"""
+        while True:
+            lines = [await self._log_q.get()]
+            while not self._log_q.empty():
+                lines.append(self._log_q.get_nowait())
+            done = None in lines
+            if done:
+                lines = lines[:lines.index(None)]
+            if lines:
+                sys.stdout.write('\n'.join(lines) + '\n')
+                sys.stdout.flush()
+            if done:
+                return
     
     def get_random_flash_plugins(self, flash_plugins, min_plugins=0, max_plugins=3):
         """Generate a realistic subset of browser plugins"""
@@ -34,16 +308,26 @@ class AdvancedFingerprintTester:
         if len(flash_plugins) == 0:
             return []
 
-        num_plugins = random.randint(min_plugins, min(max_plugins, len(flash_plugins)))
+        randint = random.randint
+        randrange = random.randrange
+
+        num_plugins = randint(min_plugins, min(max_plugins, len(flash_plugins)))
         if num_plugins == 0:
             return []
 
-        # Use random.choices instead of random.sample to handle edge cases
         if num_plugins >= len(flash_plugins):
             return flash_plugins.copy()
-        else:
-            selected_plugins = random.sample(flash_plugins, num_plugins)
-            return selected_plugins 
+
+        # Partial Fisher-Yates over the precomputed index pool: only the first
+        # num_plugins slots are shuffled, which is all we need for 0-3 picks
+        if len(self._plugin_indices) != len(flash_plugins):
+            self._plugin_indices = list(range(len(flash_plugins)))
+        indices = self._plugin_indices.copy()
+        pool_size = len(indices)
+        for i in range(num_plugins):
+            j = randrange(i, pool_size)
+            indices[i], indices[j] = indices[j], indices[i]
+        return [flash_plugins[index] for index in indices[:num_plugins]]
         
     def load_data_files(self):
         """Load all data from .txt files"""
@@ -66,57 +350,82 @@ class AdvancedFingerprintTester:
                 print(f"❌ File {filename} not found! Creating sample file...")
                 self.create_sample_file(filename, key)
                 data[key] = self.get_sample_data(key)
+
+        self.index_data(data)
         return data
     
+    def index_data(self, data):
+        """Build the lookup tables and init script that combinations are generated and tested from"""
+        self._plugin_indices = list(range(len(data['flash_plugins'])))
+        _PLUGINS_BY_NAME.clear()
+        if isinstance(data['flash_plugins'], list):
+            _PLUGINS_BY_NAME.update((_plugin_key(plugin), plugin) for plugin in data['flash_plugins'])
+        _plugins_json.cache_clear()
+
+        # Ship the font pool once with the static hooks; combinations only
+        # send indices into it
+        self._font_index = {font: index for index, font in enumerate(data['fonts'])}
+        self._static_init_script = f"window.__fontPool = {_dumps(data['fonts'])};\n" + _STATIC_INIT_SCRIPT
+        vendors, renderers = self.parse_webgl_data(data['webgl_vendor_renderer'])
+        self._webgl_vendors, self._webgl_renderers = tuple(vendors), tuple(renderers)
+    
     def get_weighted_resolution(self, resolutions):
         """Favor uncommon screen resolutions for uniqueness"""
-        common_resolutions = ['1920x1080', '1366x768', '1280x720', '1536x864']
-        uncommon_resolutions = [r for r in resolutions if r not in common_resolutions]
-        
-        # 20% chance of common, 80% chance of uncommon for maximum uniqueness
-        if random.random() < 0.2 and common_resolutions:
-            return random.choice([r for r in common_resolutions if r in resolutions])
-        else:
-            return random.choice(uncommon_resolutions if uncommon_resolutions else resolutions)
+        return self.sample_weighted('screen_resolutions', resolutions)[0]
     
     def get_weighted_timezone(self, timezones):
         """Favor uncommon timezones"""
-        common_timezones = ['America/New_York', 'Europe/London', 'America/Los_Angeles', 'UTC']
-        uncommon_timezones = [t for t in timezones if t not in common_timezones]
-        
-        # 15% chance of common, 85% chance of uncommon
-        if random.random() < 0.15 and common_timezones:
-            return random.choice([t for t in common_timezones if t in timezones])
-        else:
-            return random.choice(uncommon_timezones if uncommon_timezones else timezones)
+        return self.sample_weighted('timezones', timezones)[0]
     
     def get_weighted_language(self, languages):
         """Favor uncommon language combinations"""
-        common_languages = ['en-US,en;q=0.9', 'en-GB,en;q=0.9', 'en,en-US;q=0.9']
-        uncommon_languages = [l for l in languages if l not in common_languages]
+        return self.sample_weighted('languages', languages)[0]
+    
+    def build_weighted_table(self, values, common_values, common_weight):
+        """Build a (pool, cumulative weights) table favoring uncommon values"""
+        common = [v for v in common_values if v in values]
+        uncommon = [v for v in values if v not in common_values]
+        if not common or not uncommon:
+            # Only one bucket exists, so every value is equally likely
+            return list(uncommon or values), None
         
-        # 10% chance of common, 90% chance of uncommon
-        if random.random() < 0.1 and common_languages:
-            return random.choice([l for l in common_languages if l in languages])
-        else:
-            return random.choice(uncommon_languages if uncommon_languages else languages)
+        weights = [common_weight / len(common)] * len(common)
+        weights += [(1 - common_weight) / len(uncommon)] * len(uncommon)
+        return common + uncommon, list(itertools.accumulate(weights))
+    
+    def sample_weighted(self, category, values, k=1):
+        """Draw k values from a category, binary-searching its cumulative weights"""
+        table = self._weighted_tables.get(category)
+        if table is None or table[0] is not values:
+            common_values, common_weight = self.WEIGHTED_CATEGORIES[category]
+            table = (values, *self.build_weighted_table(values, common_values, common_weight))
+            self._weighted_tables[category] = table
+        _, pool, cum_weights = table
+        return random.choices(pool, cum_weights=cum_weights, k=k)
     
     def get_random_font_subset(self, fonts, min_fonts=20, max_fonts=50):
         """Generate a realistic subset of installed fonts"""
         # Always include some common fonts
         common_fonts = ['Arial', 'Times New Roman', 'Helvetica', 'Georgia', 'Verdana']
         available_common = [f for f in fonts if any(common in f for common in common_fonts)]
+        randint = random.randint
+        sample = random.sample
         
         # Select random subset
-        num_fonts = random.randint(min_fonts, min(max_fonts, len(fonts)))
-        selected_fonts = random.sample(fonts, min(num_fonts, len(fonts)))
+        num_fonts = randint(min_fonts, min(max_fonts, len(fonts)))
+        selected_fonts = sample(fonts, min(num_fonts, len(fonts)))
         
         # Ensure some common fonts are included
         if available_common:
-            selected_fonts.extend(random.sample(available_common, min(3, len(available_common))))
+            selected_fonts.extend(sample(available_common, min(3, len(available_common))))
         
         return list(set(selected_fonts))  # Remove duplicates
     
+    def encode_font_indices(self, fonts):
+        """Encode fonts as base64 little-endian uint16 indices into the font pool"""
+        indices = [self._font_index[font] for font in fonts]
+        return base64.b64encode(struct.pack(f'<{len(indices)}H', *indices)).decode('ascii')
+    
     def parse_webgl_data(self, webgl_data):
         """Parse WebGL vendor/renderer data"""
         vendors = []
@@ -204,242 +513,163 @@ class AdvancedFingerprintTester:
         return samples.get(data_type, ['sample_data'])
     
     def generate_advanced_combinations(self, data, max_combinations=100):
-        """Generate advanced combinations targeting maximum uniqueness"""
-        combinations = []
+        """Yield advanced combinations targeting maximum uniqueness"""
+        seen = set()
         
-        # Parse WebGL data
-        vendors, renderers = self.parse_webgl_data(data['webgl_vendor_renderer'])
+        # WebGL data is parsed once in load_data_files
+        if not self._webgl_vendors:
+            vendors, renderers = self.parse_webgl_data(data['webgl_vendor_renderer'])
+            self._webgl_vendors, self._webgl_renderers = tuple(vendors), tuple(renderers)
+        vendors, renderers = self._webgl_vendors, self._webgl_renderers
+        
+        # Bind the random helpers once; they are called ~18 times per combination
+        choice = random.choice
+        randint = random.randint
+        
+        # Weighted categories are drawn for the whole batch up front
+        resolutions = self.sample_weighted('screen_resolutions', data['screen_resolutions'], max_combinations)
+        timezones = self.sample_weighted('timezones', data['timezones'], max_combinations)
+        languages = self.sample_weighted('languages', data['languages'], max_combinations)
         
-        for _ in range(max_combinations):
+        for i in range(max_combinations):
             # Generate unique font subset for each combination
             font_subset = self.get_random_font_subset(data['fonts'])
             
             combo = {
-                'user_agent': random.choice(data['user_agents']),
-                'screen_resolution': self.get_weighted_resolution(data['screen_resolutions']),
-                'timezone': self.get_weighted_timezone(data['timezones']),
-                'language': self.get_weighted_language(data['languages']),
-                'platform': random.choice(data['platforms']),
-                'flash_language': random.choice(data['flash_languages']),
-                'flash_platform': random.choice(data['flash_platforms']),
+                'user_agent': choice(data['user_agents']),
+                'screen_resolution': resolutions[i],
+                'timezone': timezones[i],
+                'language': languages[i],
+                'platform': choice(data['platforms']),
+                'flash_language': choice(data['flash_languages']),
+                'flash_platform': choice(data['flash_platforms']),
                 'fonts': font_subset,
-                'webgl_vendor': random.choice(vendors),
-                'webgl_renderer': random.choice(renderers),
-                'hardware_concurrency': random.randint(2, 32),
-                'device_memory': random.choice([0.25, 0.5, 1, 2, 4, 8, 16, 32]),
-                'color_depth': random.choice([16, 24, 30, 32, 48]),
-                'pixel_ratio': random.choice([1, 1.25, 1.5, 2, 2.5, 3]),
-                'max_touch_points': random.choice([0, 1, 2, 5, 10]),
-                'canvas_noise': random.randint(1, 10),  # Level of canvas noise to add
-                'webgl_noise': random.randint(1, 5),    # Level of WebGL noise
+                'webgl_vendor': choice(vendors),
+                'webgl_renderer': choice(renderers),
+                'hardware_concurrency': randint(2, 32),
+                'device_memory': choice([0.25, 0.5, 1, 2, 4, 8, 16, 32]),
+                'color_depth': choice([16, 24, 30, 32, 48]),
+                'pixel_ratio': choice([1, 1.25, 1.5, 2, 2.5, 3]),
+                'max_touch_points': choice([0, 1, 2, 5, 10]),
+                'canvas_noise': randint(1, 10),  # Level of canvas noise to add
+                'webgl_noise': randint(1, 5),    # Level of WebGL noise
                 'flash_plugins': self.get_random_flash_plugins(data['flash_plugins'])
             }
             
-            # Avoid exact duplicates
-            if combo not in combinations:
-                combinations.append(combo)
-        
-        return combinations
+            # Avoid exact duplicates. Only a 64-bit hash of each combination is
+            # kept, so the set does not pin every font subset in memory; plugins
+            # are keyed by identity since they always come from the loaded list
+            key = hash((
+                *(value for field, value in combo.items() if field not in ('fonts', 'flash_plugins')),
+                frozenset(font_subset),
+                tuple(map(id, combo['flash_plugins']))
+            ))
+            if key in seen:
+                continue
+            seen.add(key)
+            # Counts shown in the log, summary and CSVs, computed once here
+            combo['_derived'] = {
+                'fonts_count': len(font_subset),
+                'flash_plugins_count': len(combo['flash_plugins'])
+            }
+            yield combo
     
-    async def test_advanced_combination(self, browser, combination, test_sites):
+    async def apply_page_fingerprint(self, context, page, combination):
+        """Emulate a combination's browser-level settings on a page of a pooled context"""
+        width, height = map(int, combination['screen_resolution'].split('x'))
+        return await apply_emulation(
+            context, page, combination['user_agent'], combination['language'], combination['platform'],
+            combination['timezone'], width, height, combination['pixel_ratio']
+        )
+    
+    async def test_advanced_combination(self, context, combination, test_sites):
         """Test an advanced combination with comprehensive fingerprint spoofing"""
         try:
-            # Parse screen resolution
-            width, height = map(int, combination['screen_resolution'].split('x'))
-            
-            # Create context with enhanced fingerprint settings
-            context = await browser.new_context(
-                user_agent=combination['user_agent'],
-                viewport={'width': width, 'height': height},
-                locale=combination['language'].split(',')[0],
-                timezone_id=combination['timezone'],
-                device_scale_factor=combination['pixel_ratio'],
-                java_script_enabled=True,
-                extra_http_headers={
-                    'Accept-Language': combination['language']
+            # The static hooks are already on the pooled context; the
+            # per-combination values they read from window.__fp go on each
+            # page. The hooks only read window.__fp lazily, so the evaluation
+            # order of the two scripts does not matter.
+            fp_config = {
+                'platform': combination['platform'],
+                'hardwareConcurrency': combination['hardware_concurrency'],
+                'deviceMemory': combination['device_memory'],
+                'maxTouchPoints': combination['max_touch_points'],
+                'colorDepth': combination['color_depth'],
+                'flashLanguage': combination['flash_language'],
+                'flashPlatform': combination['flash_platform'],
+                'webglVendor': combination['webgl_vendor'],
+                'webglRenderer': combination['webgl_renderer'],
+                'canvasNoise': combination['canvas_noise'],
+                'fontIdx': self.encode_font_indices(combination['fonts']),
+                'battery': {
+                    'charging': random.choice([True, False]),
+                    'chargingTime': random.randint(3600, 14400),
+                    'dischargingTime': random.randint(7200, 28800),
+                    'level': round(random.uniform(0.1, 1.0), 2)
                 }
+            }
+            plugins_json = _plugins_json(tuple(sorted(map(_plugin_key, combination['flash_plugins']))))
+            fp_script = (
+                f"window.__fp = {_dumps(fp_config)};\n"
+                f"window.__fp.plugins = {plugins_json};"
             )
             
-            page = await context.new_page()
+            # Sites load concurrently, each on its own page, capped per combination
+            site_limit = asyncio.Semaphore(min(self.SITE_CONCURRENCY, len(test_sites)) or 1)
             
-            # Comprehensive fingerprint spoofing script
-            await page.add_init_script(f"""
-                // Platform override
-                Object.defineProperty(navigator, 'platform', {{
-                    get: () => '{combination['platform']}'
-                }});
-                
-                // Hardware specs
-                Object.defineProperty(navigator, 'hardwareConcurrency', {{
-                    get: () => {combination['hardware_concurrency']}
-                }});
-                
-                Object.defineProperty(navigator, 'deviceMemory', {{
-                    get: () => {combination['device_memory']}
-                }});
-                
-                Object.defineProperty(navigator, 'maxTouchPoints', {{
-                    get: () => {combination['max_touch_points']}
-                }});
-                
-                // Screen properties
-                Object.defineProperty(screen, 'colorDepth', {{
-                    get: () => {combination['color_depth']}
-                }});
-                
-                Object.defineProperty(screen, 'pixelDepth', {{
-                    get: () => {combination['color_depth']}
-                }});
-                
-                // Flash plugin simulation
-                # Dynamic Flash plugins simulation
-                const flashPluginsData = {json.dumps(combination['flash_plugins'])};
-
-                if (flashPluginsData && flashPluginsData.length > 0) {{
-                    Object.defineProperty(navigator, 'plugins', {{
-                        get: () => {{
-                            const plugins = flashPluginsData.map(plugin => ({{
-                                name: plugin.name,
-                                description: plugin.description,
-                                filename: plugin.filename,
-                                version: plugin.version,
-                                length: plugin.mimeTypes ? plugin.mimeTypes.length : 1
-                            }}));
-                            return plugins;
-                        }}
-                    }});
-                }} else {{
-                    Object.defineProperty(navigator, 'plugins', {{
-                        get: () => []
-                    }});
-                }}
-
-                // Flash language and platform
-                window.flashLanguage = '{combination['flash_language']}';
-                window.flashPlatform = '{combination['flash_platform']}';
-
-                // Font detection spoofing
-                const availableFonts = {json.dumps(combination['fonts'])};
-                const originalMeasureText = CanvasRenderingContext2D.prototype.measureText;
-                CanvasRenderingContext2D.prototype.measureText = function(text) {{
-                    // Simulate different font metrics based on available fonts
-                    const result = originalMeasureText.call(this, text);
-                    if (this.font && !availableFonts.some(font => this.font.includes(font))) {{
-                        // Slightly modify metrics for unavailable fonts
-                        result.width *= 0.95 + Math.random() * 0.1;
-                    }}
-                    return result;
-                }};
-                
-                // WebGL fingerprinting with custom vendor/renderer
-                const getParameter = WebGLRenderingContext.prototype.getParameter;
-                WebGLRenderingContext.prototype.getParameter = function(parameter) {{
-                    if (parameter === 37445) {{ // UNMASKED_VENDOR_WEBGL
-                        return '{combination['webgl_vendor']}';
-                    }}
-                    if (parameter === 37446) {{ // UNMASKED_RENDERER_WEBGL  
-                        return '{combination['webgl_renderer']}';
-                    }}
-                    return getParameter.call(this, parameter);
-                }};
-                
-                // Canvas fingerprinting with controlled noise
-                const getContext = HTMLCanvasElement.prototype.getContext;
-                HTMLCanvasElement.prototype.getContext = function(type) {{
-                    const context = getContext.call(this, type);
-                    if (type === '2d') {{
-                        const getImageData = context.getImageData;
-                        context.getImageData = function(...args) {{
-                            const imageData = getImageData.apply(this, args);
-                            // Add controlled noise based on canvas_noise level
-                            const noiseLevel = {combination['canvas_noise']};
-                            for (let i = 0; i < imageData.data.length; i += 4) {{
-                                imageData.data[i] += Math.floor(Math.random() * noiseLevel) - (noiseLevel/2);
-                                imageData.data[i+1] += Math.floor(Math.random() * noiseLevel) - (noiseLevel/2);
-                                imageData.data[i+2] += Math.floor(Math.random() * noiseLevel) - (noiseLevel/2);
-                            }}
-                            return imageData;
-                        }};
-                    }}
-                    return context;
-                }};
-                
-                // Audio context fingerprinting noise
-                const AudioContext = window.AudioContext || window.webkitAudioContext;
-                if (AudioContext) {{
-                    const originalCreateOscillator = AudioContext.prototype.createOscillator;
-                    AudioContext.prototype.createOscillator = function() {{
-                        const oscillator = originalCreateOscillator.call(this);
-                        const originalFrequency = oscillator.frequency;
-                        // Add slight frequency variation
-                        Object.defineProperty(oscillator, 'frequency', {{
-                            get: () => {{
-                                const variation = 1 + (Math.random() - 0.5) * 0.0001;
-                                return originalFrequency.value * variation;
-                            }}
-                        }});
-                        return oscillator;
-                    }};
-                }}
-                
-                // Override Date timezone for consistency
-                const originalDate = Date;
-                Date = function(...args) {{
-                    if (args.length === 0) {{
-                        return new originalDate();
-                    }}
-                    return new originalDate(...args);
-                }};
-                Date.prototype = originalDate.prototype;
-                
-                // Battery API spoofing (if available)
-                if (navigator.getBattery) {{
-                    navigator.getBattery = async () => ({{
-                        charging: {random.choice(['true', 'false'])},
-                        chargingTime: {random.randint(3600, 14400)},
-                        dischargingTime: {random.randint(7200, 28800)},
-                        level: {random.uniform(0.1, 1.0):.2f}
-                    }});
-                }}
-            """)
-            
-            results = {}
-            
-            for site_name, site_config in test_sites.items():
+            async def _one_site(site_name, site_config):
+                async with site_limit:
+                    return await _visit_site(site_name, site_config)
+            
+            async def _visit_site(site_name, site_config):
+                page = await context.new_page()
                 try:
-                    print(f"  🔍 Testing {site_name}...")
-                    await page.goto(site_config['url'], wait_until='networkidle', timeout=30000)
-                    
-                    # Wait for the site to load and analyze
-                    await page.wait_for_timeout(site_config.get('wait_time', 8000))
-                    
-                    # Extract uniqueness data based on site
-                    if site_name == 'amiunique':
-                        uniqueness_data = await self.extract_amiunique_data(page)
-                    elif site_name == 'coveryourtracks':
-                        uniqueness_data = await self.extract_eff_data(page)
-                    elif site_name == 'deviceinfo':
-                        uniqueness_data = await self.extract_deviceinfo_data(page)
-                    elif site_name == 'browserleaks':
-                        uniqueness_data = await self.extract_browserleaks_data(page)
-                    else:
-                        uniqueness_data = await self.extract_generic_data(page)
-                    
-                    await page.wait_for_timeout(5000)  # Wait 10 seconds to view results
-                    results[site_name] = uniqueness_data
-                    
-                    # Small delay between tests
-                    await page.wait_for_timeout(3000)
+                    self._log(f"  🔍 Testing {site_name}...")
+                    # Politeness is paced per target host rather than per combination
+                    host = urlparse(site_config['url']).netloc
+                    await self._host_limiters[host].acquire()
+                    async with asyncio.timeout(site_config.get('timeout', 90)):
+                        await self.apply_page_fingerprint(context, page, combination)
+                        await page.add_init_script(fp_script)
+                        await page.goto(site_config['url'], wait_until='networkidle', timeout=30000)
+                        
+                        # Wait for the site to load and analyze
+                        await page.wait_for_timeout(site_config.get('wait_time', 8000))
+                        
+                        # Extract uniqueness data based on site
+                        if site_name == 'amiunique':
+                            uniqueness_data = await self.extract_amiunique_data(page)
+                        elif site_name == 'coveryourtracks':
+                            uniqueness_data = await self.extract_eff_data(page)
+                        elif site_name == 'deviceinfo':
+                            uniqueness_data = await self.extract_deviceinfo_data(page)
+                        elif site_name == 'browserleaks':
+                            uniqueness_data = await self.extract_browserleaks_data(page)
+                        else:
+                            uniqueness_data = await self.extract_generic_data(page)
+                        
+                        await page.wait_for_timeout(5000)  # Wait 5 seconds to view results
+                    return uniqueness_data
                     
                 except Exception as e:
-                    print(f"    ❌ Error testing {site_name}: {str(e)}")
-                    results[site_name] = {'error': str(e)}
+                    self._log(f"    ❌ Error testing {site_name}: {str(e) or type(e).__name__}")
+                    return {'error': str(e) or type(e).__name__}
+                finally:
+                    await page.close()
+            
+            outcomes = await asyncio.gather(
+                *(_one_site(site_name, site_config) for site_name, site_config in test_sites.items()),
+                return_exceptions=True
+            )
+            results = {
+                site_name: {'error': str(outcome) or type(outcome).__name__} if isinstance(outcome, Exception) else outcome
+                for site_name, outcome in zip(test_sites, outcomes)
+            }
             
-            await context.close()
             return results
             
         except Exception as e:
-            print(f"  ❌ Error with combination: {str(e)}")
+            self._log(f"  ❌ Error with combination: {str(e)}")
             return {'error': str(e)}
     
     async def extract_amiunique_data(self, page):
@@ -614,11 +844,9 @@ class AdvancedFingerprintTester:
         """Generic extraction for other fingerprinting sites"""
         try:
             content = await page.content()
-            page_text = content.lower()
             
-            # Look for uniqueness indicators
-            uniqueness_keywords = ['unique', 'identifiable', 'fingerprint', 'one in', 'bits of information']
-            uniqueness_score = sum(page_text.count(keyword) for keyword in uniqueness_keywords)
+            # Look for uniqueness indicators in a single case-insensitive pass
+            uniqueness_score = len(self._UNIQ_RE.findall(content))
             is_unique = uniqueness_score > 2
             
             return {
@@ -631,7 +859,30 @@ class AdvancedFingerprintTester:
         except Exception as e:
             return {'site': 'Generic', 'error': f'Extraction failed: {str(e)}'}
     
-    async def run_advanced_tests(self, max_combinations=50, max_concurrent=3):
+    # Comprehensive test sites
+    TEST_SITES = {
+        'amiunique': {
+            'url': 'https://amiunique.org/fingerprint',
+            'wait_time': 10000
+        },
+        'coveryourtracks': {
+            'url': 'https://coveryourtracks.eff.org/',
+            'wait_time': 12000
+        },
+        'deviceinfo': {
+            'url': 'https://www.deviceinfo.me/',
+            'wait_time': 8000
+        },
+        'browserleaks': {
+            'url': 'https://browserleaks.com/canvas',
+            'wait_time': 10000
+        }
+    }
+    
+    # Most sites one combination loads at the same time
+    SITE_CONCURRENCY = 3
+    
+    async def run_advanced_tests(self, max_combinations=50, max_concurrent=3, headless=True):
         """Main function to run advanced fingerprint tests"""
         print("🚀 Starting Advanced Browser Fingerprint Uniqueness Tester")
         print("🎯 Goal: Find the most unique browser fingerprint possible")
@@ -640,125 +891,203 @@ class AdvancedFingerprintTester:
         # Load all data files
         data = self.load_data_files()
         
-        # Generate advanced combinations
+        # Combinations are generated lazily while the workers test them
         combinations = self.generate_advanced_combinations(data, max_combinations)
         
-        # Define comprehensive test sites
-        test_sites = {
-            'amiunique': {
-                'url': 'https://amiunique.org/fingerprint',
-                'wait_time': 10000
-            },
-            'coveryourtracks': {
-                'url': 'https://coveryourtracks.eff.org/',
-                'wait_time': 12000
-            },
-            'deviceinfo': {
-                'url': 'https://www.deviceinfo.me/',
-                'wait_time': 8000
-            },
-            'browserleaks': {
-                'url': 'https://browserleaks.com/canvas',
-                'wait_time': 10000
-            }
-        }
-        
-        print(f"\n🧪 Testing {len(combinations)} advanced combinations on {len(test_sites)} sites")
+        print(f"\n🧪 Testing up to {max_combinations} advanced combinations on {len(self.TEST_SITES)} sites")
         print(f"🔄 Running {max_concurrent} tests concurrently")
         print("📊 Tracking uniqueness percentages and entropy scores")
         print("=" * 70)
         
+        # Result files from this run share one timestamp
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        combinations_tested, unique_count, best_combinations = await self._run_shard(
+            enumerate(combinations), max_concurrent, headless, max_combinations, timestamp
+        )
+        
+        # Save comprehensive results
+        await self.save_advanced_results(best_combinations, timestamp)
+        self.print_summary(combinations_tested, unique_count, best_combinations)
+    
+    def run_multiproc(self, max_combinations=50, processes=4, max_concurrent=2, headless=True):
+        """Split the combinations across worker processes, each with its own browser and event loop"""
+        print("🚀 Starting Advanced Browser Fingerprint Uniqueness Tester")
+        print("=" * 70)
+        
+        data = self.load_data_files()
+        combinations = list(enumerate(self.generate_advanced_combinations(data, max_combinations)))
+        processes = max(1, min(os.cpu_count() or 1, processes, len(combinations)))
+        
+        print(f"\n🧪 Testing {len(combinations)} advanced combinations on {len(self.TEST_SITES)} sites")
+        print(f"🔄 Running {processes} processes with {max_concurrent} tests each")
+        print("=" * 70)
+        
+        # Every shard writes its own unique results file
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        shards = [
+            (data, combinations[n::processes], max_concurrent, headless, len(combinations), f"{timestamp}_shard{n + 1}",
+             self.csv_buffering)
+            for n in range(processes)
+        ]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_shard_entry, shards))
+        
+        combinations_tested = sum(result[0] for result in results)
+        unique_count = sum(result[1] for result in results)
+        best_combinations = heapq.nlargest(
+            10, itertools.chain.from_iterable(result[2] for result in results),
+            key=lambda result: (result.average_uniqueness, result.combination_id)
+        )
+        
+        asyncio.run(self.save_advanced_results(best_combinations, timestamp))
+        self.print_summary(combinations_tested, unique_count, best_combinations)
+    
+    async def _run_shard(self, combinations, max_concurrent, headless, total, run_tag):
+        """Test (index, combination) pairs on one browser; returns (tested, unique count, best results)"""
+        # Let tasks run synchronously until their first real suspension (3.12+)
+        if hasattr(asyncio, 'eager_task_factory'):
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+        
+        test_sites = self.TEST_SITES
+        site_urls = [urlparse(site['url']) for site in test_sites.values()]
+        site_origins = [f"{url.scheme}://{url.netloc}" for url in site_urls]
+        # One limiter per host; they hold asyncio locks, so every event loop
+        # starts with fresh ones
+        self._host_limiters = {url.netloc: RateLimiter() for url in site_urls}
+        
         async with async_playwright() as playwright:
             # Launch browser with anti-detection features
             browser = await playwright.chromium.launch(
-                headless=False,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-background-timer-throttling',
-                    '--disable-backgrounding-occluded-windows',
-                    '--disable-renderer-backgrounding'
-                ]
+                headless=headless,  # Pass --headed on the command line to watch the tests
+                args=list(ANTI_DETECT_ARGS)
             )
             
-            # Process combinations and track best results
-            unique_combinations = []
-            best_combinations = []
-            semaphore = asyncio.Semaphore(max_concurrent)
+            # Unique results are streamed to disk; only the best ones stay in memory
+            unique_count = 0
+            best_heap = []  # min-heap of (average_uniqueness, index, result), top 10 only
+            combinations_tested = 0
+            
+            # Contexts are expensive to bootstrap, so one per worker is created
+            # up front and reused; per-combination settings are applied per page
+            context_pool = asyncio.Queue()
+            for _ in range(max_concurrent):
+                context = await browser.new_context(java_script_enabled=True)
+                await context.add_init_script(self._static_init_script)
+                context_pool.put_nowait(context)
             
             async def test_single_combination(combo_index, combination):
-                async with semaphore:
-                    print(f"\n🔄 Testing combination {combo_index + 1}/{len(combinations)}")
-                    print(f"   UA: {combination['user_agent'][:60]}...")
-                    print(f"   Resolution: {combination['screen_resolution']}")
-                    print(f"   Timezone: {combination['timezone']}")
-                    print(f"   WebGL: {combination['webgl_vendor']} - {combination['webgl_renderer']}")
-                    print(f"   Fonts: {len(combination['fonts'])} fonts loaded")
-                    
-                    results = await self.test_advanced_combination(browser, combination, test_sites)
-                    
-                    # Analyze results for uniqueness
-                    uniqueness_scores = []
-                    is_unique = False
-                    best_score = 0
-                    
-                    for site, result in results.items():
-                        if 'error' not in result:
-                            if result.get('is_unique', False):
-                                is_unique = True
-                            
-                            # Extract numeric scores
-                            if 'uniqueness_percentage' in result:
-                                score = result['uniqueness_percentage']
-                                uniqueness_scores.append(score)
-                                best_score = max(best_score, score)
-                    
-                    # Calculate average uniqueness
-                    avg_uniqueness = sum(uniqueness_scores) / len(uniqueness_scores) if uniqueness_scores else 0
-                    
-                    combination_result = {
-                        'combination_id': combo_index + 1,
-                        'timestamp': datetime.now().isoformat(),
-                        'is_unique': is_unique,
-                        'best_uniqueness_score': best_score,
-                        'average_uniqueness': avg_uniqueness,
-                        'test_results': results,
-                        'fingerprint_config': combination
-                    }
-                    
-                    # Track best performing combinations
-                    if avg_uniqueness > 90 or is_unique:
-                        unique_combinations.append(combination_result)
-                        print(f"   ✅ HIGH UNIQUENESS! Avg: {avg_uniqueness:.1f}% Best: {best_score:.1f}%")
-                    else:
-                        print(f"   📊 Uniqueness: Avg: {avg_uniqueness:.1f}% Best: {best_score:.1f}%")
-                    
-                    # Keep track of top 10 combinations
-                    best_combinations.append(combination_result)
-                    best_combinations.sort(key=lambda x: x['average_uniqueness'], reverse=True)
-                    best_combinations = best_combinations[:10]
-                    
-                    # Respectful delay
-                    await asyncio.sleep(2)
+                self._log(
+                    f"\n🔄 Testing combination {combo_index + 1}/{total}\n"
+                    f"   UA: {combination['user_agent'][:60]}...\n"
+                    f"   Resolution: {combination['screen_resolution']}\n"
+                    f"   Timezone: {combination['timezone']}\n"
+                    f"   WebGL: {combination['webgl_vendor']} - {combination['webgl_renderer']}\n"
+                    f"   Fonts: {combination['_derived']['fonts_count']} fonts loaded"
+                )
+                
+                context = await context_pool.get()
+                try:
+                    results = await self.test_advanced_combination(context, combination, test_sites)
+                finally:
+                    try:
+                        await reset_context(context, site_origins)
+                    finally:
+                        context_pool.put_nowait(context)
+                
+                # Analyze results for uniqueness
+                uniqueness_scores = []
+                is_unique = False
+                best_score = 0
+                
+                for site, result in results.items():
+                    if 'error' not in result:
+                        if result.get('is_unique', False):
+                            is_unique = True
+                        
+                        # Extract numeric scores
+                        if 'uniqueness_percentage' in result:
+                            score = result['uniqueness_percentage']
+                            uniqueness_scores.append(score)
+                            best_score = max(best_score, score)
+                
+                # Calculate average uniqueness
+                avg_uniqueness = sum(uniqueness_scores) / len(uniqueness_scores) if uniqueness_scores else 0
+                
+                combination_result = ComboResult(
+                    combination_id=combo_index + 1,
+                    timestamp=datetime.now().isoformat(),
+                    is_unique=is_unique,
+                    best_uniqueness_score=best_score,
+                    average_uniqueness=avg_uniqueness,
+                    test_results=results,
+                    fingerprint_config=combination
+                )
+                
+                # Track best performing combinations
+                if avg_uniqueness > 90 or is_unique:
+                    self._result_q.put_nowait(combination_result)
+                    self._log(f"   ✅ HIGH UNIQUENESS! Avg: {avg_uniqueness:.1f}% Best: {best_score:.1f}%")
+                else:
+                    self._log(f"   📊 Uniqueness: Avg: {avg_uniqueness:.1f}% Best: {best_score:.1f}%")
+                
+                # Keep track of top 10 combinations
+                entry = (avg_uniqueness, combo_index, combination_result)
+                if len(best_heap) < 10:
+                    heapq.heappush(best_heap, entry)
+                else:
+                    heapq.heappushpop(best_heap, entry)
+            
+            # A bounded queue keeps generation just ahead of testing; the worker
+            # count is the concurrency limit
+            queue = asyncio.Queue(maxsize=max_concurrent)
+            
+            async def producer():
+                for item in combinations:
+                    await queue.put(item)
+                for _ in range(max_concurrent):
+                    await queue.put(None)
+            
+            async def worker():
+                nonlocal combinations_tested
+                while (item := await queue.get()) is not None:
+                    i, combo = item
+                    combinations_tested += 1
+                    try:
+                        await test_single_combination(i, combo)
+                    except Exception as e:
+                        self._log(f"  ❌ Error with combination {i + 1}: {str(e)}")
+            
+            # Worker progress goes through one drainer task instead of
+            # contending for stdout
+            self._log_q = asyncio.Queue()
+            log_drainer = asyncio.create_task(self._log_drainer())
+            self._result_q = asyncio.Queue()
+            result_writer = asyncio.create_task(self._result_writer(run_tag))
             
             # Run all tests
-            tasks = [
-                test_single_combination(i, combo) 
-                for i, combo in enumerate(combinations)
-            ]
+            workers = [asyncio.create_task(worker()) for _ in range(max_concurrent)]
             
-            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await asyncio.gather(producer(), *workers)
+            finally:
+                self._result_q.put_nowait(None)
+                unique_count = await result_writer
+                self._result_q = None
+                self._log_q.put_nowait(None)
+                await log_drainer
+                self._log_q = None
             await browser.close()
         
-        # Save comprehensive results
-        await self.save_advanced_results(unique_combinations, best_combinations)
-        
-        # Print summary
+        best_combinations = [entry[2] for entry in sorted(best_heap, reverse=True)]
+        return combinations_tested, unique_count, best_combinations
+    
+    def print_summary(self, combinations_tested, unique_count, best_combinations):
+        """Print the run summary and the top 3 combinations"""
         print(f"\n🎉 Advanced Testing Completed!")
-        print(f"📊 Total combinations tested: {len(combinations)}")
-        print(f"✅ High uniqueness combinations found: {len(unique_combinations)}")
-        print(f"🏆 Best average uniqueness: {best_combinations[0]['average_uniqueness']:.1f}%" if best_combinations else "No results")
+        print(f"📊 Total combinations tested: {combinations_tested}")
+        print(f"✅ High uniqueness combinations found: {unique_count}")
+        print(f"🏆 Best average uniqueness: {best_combinations[0].average_uniqueness:.1f}%" if best_combinations else "No results")
         print(f"📁 Results saved to CSV files")
         
         # Print top 3 combinations
@@ -766,8 +1095,8 @@ class AdvancedFingerprintTester:
             print(f"\n🏆 TOP 3 MOST UNIQUE COMBINATIONS:")
             print("=" * 50)
             for i, combo in enumerate(best_combinations[:3], 1):
-                print(f"\n#{i} - Average Uniqueness: {combo['average_uniqueness']:.1f}%")
-                config = combo['fingerprint_config']
+                print(f"\n#{i} - Average Uniqueness: {combo.average_uniqueness:.1f}%")
+                config = combo.fingerprint_config
                 print(f"   🌐 User Agent: {config['user_agent'][:80]}...")
                 print(f"   📺 Resolution: {config['screen_resolution']}")
                 print(f"   🌍 Timezone: {config['timezone']}")
@@ -776,93 +1105,80 @@ class AdvancedFingerprintTester:
                 print(f"   📝 Languages: {config['language']}")
                 print(f"   🎯 Hardware Concurrency: {config['hardware_concurrency']}")
                 print(f"   💾 Device Memory: {config['device_memory']}GB")
-                print(f"   🎪 Flash Enabled: {config['flash_enabled']}")
-                print(f"   📚 Fonts Available: {len(config['fonts'])}")
+                derived = config['_derived']
+                print(f"   🎪 Flash Plugins: {derived['flash_plugins_count']}")
+                print(f"   📚 Fonts Available: {derived['fonts_count']}")
     
-    async def save_advanced_results(self, unique_combinations, best_combinations):
-        """Save comprehensive results to CSV files"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    async def _result_writer(self, run_tag):
+        """Write high uniqueness results to CSV and JSON Lines as they arrive"""
+        unique_csv = f"unique_fingerprints_{run_tag}.csv"
+        # Full test results go to a JSON Lines file; the CSV only keeps the id
+        results_jsonl = f"test_results_{run_tag}.jsonl"
+        csvfile = jsonl = writer = None
+        written = 0
         
-        # Save unique combinations
-        if unique_combinations:
-            unique_csv = f"unique_fingerprints_{timestamp}.csv"
-            with open(unique_csv, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = [
-                    'combination_id', 'timestamp', 'is_unique', 'best_uniqueness_score',
-                    'average_uniqueness', 'user_agent', 'screen_resolution', 'timezone',
-                    'language', 'platform', 'flash_language', 'flash_platform', 'fonts_count',
-                    'webgl_vendor', 'webgl_renderer', 'hardware_concurrency', 'device_memory',
-                    'color_depth', 'pixel_ratio', 'max_touch_points', 'flash_plugins_count',
-                    'test_results_json'
-                ]
-                
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
+        try:
+            while (combo := await self._result_q.get()) is not None:
+                if csvfile is None:
+                    # Files are only created once there is something to put in them
+                    csvfile = open(unique_csv, 'w', newline='', encoding='utf-8', buffering=self.csv_buffering)
+                    jsonl = open(results_jsonl, 'w', encoding='utf-8', buffering=self.csv_buffering)
+                    writer = csv.writer(csvfile)
+                    writer.writerow(_UNIQUE_FIELDNAMES)
                 
-                for combo in unique_combinations:
-                    config = combo['fingerprint_config']
-                    row = {
-                        'combination_id': combo['combination_id'],
-                        'timestamp': combo['timestamp'],
-                        'is_unique': combo['is_unique'],
-                        'best_uniqueness_score': combo['best_uniqueness_score'],
-                        'average_uniqueness': combo['average_uniqueness'],
-                        'user_agent': config['user_agent'],
-                        'screen_resolution': config['screen_resolution'],
-                        'timezone': config['timezone'],
-                        'language': config['language'],
-                        'platform': config['platform'],
-                        'flash_language': config['flash_language'],
-                        'flash_platform': config['flash_platform'],
-                        'fonts_count': len(config['fonts']),
-                        'webgl_vendor': config['webgl_vendor'],
-                        'webgl_renderer': config['webgl_renderer'],
-                        'hardware_concurrency': config['hardware_concurrency'],
-                        'device_memory': config['device_memory'],
-                        'color_depth': config['color_depth'],
-                        'pixel_ratio': config['pixel_ratio'],
-                        'max_touch_points': config['max_touch_points'],
-                        'flash_plugins_count': len(config['flash_plugins']),
-                        'test_results_json': json.dumps(combo['test_results'])
-                    }
-                    writer.writerow(row)
-            
-            print(f"💾 Saved {len(unique_combinations)} unique combinations to {unique_csv}")
+                config = combo.fingerprint_config
+                combo_id = combo.combination_id
+                jsonl.write(_dumps({
+                    'combination_id': combo_id,
+                    'test_results': combo.test_results
+                }) + '\n')
+                ua, res, tz, lang, plat, fl, fp, wv, wr, hc, dm, cd, pr, mtp = _get_cfg(config)
+                derived = config['_derived']
+                fonts_count = derived['fonts_count']
+                plugins_count = derived['flash_plugins_count']
+                writer.writerow((
+                    combo_id, combo.timestamp, combo.is_unique,
+                    combo.best_uniqueness_score, combo.average_uniqueness,
+                    ua, res, tz, lang, plat, fl, fp, fonts_count,
+                    wv, wr, hc, dm, cd, pr, mtp, plugins_count,
+                    combo_id
+                ))
+                written += 1
+        finally:
+            if csvfile is not None:
+                csvfile.close()
+                jsonl.close()
+        
+        if written:
+            self._log(f"💾 Saved {written} unique combinations to {unique_csv} ({results_jsonl})")
+        return written
+    
+    async def save_advanced_results(self, best_combinations, timestamp=None):
+        """Save the top combinations to CSV"""
+        timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # Save top combinations
         if best_combinations:
             best_csv = f"best_fingerprints_{timestamp}.csv"
-            with open(best_csv, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = [
-                    'rank', 'combination_id', 'average_uniqueness', 'best_uniqueness_score',
-                    'user_agent', 'screen_resolution', 'timezone', 'language', 'platform',
-                    'webgl_vendor', 'webgl_renderer', 'hardware_concurrency', 'device_memory',
-                    'fonts_list', 'full_config_json'
-                ]
-                
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
+            # The leading numeric columns never need quoting, so they are
+            # joined as bytes directly; only the text tail goes through csv
+            tail_buf = io.StringIO()
+            tail_writer = csv.writer(tail_buf)
+            with open(best_csv, 'wb', buffering=self.csv_buffering) as csvfile:
+                csvfile.write(_BEST_HEADER)
                 for rank, combo in enumerate(best_combinations, 1):
-                    config = combo['fingerprint_config']
-                    row = {
-                        'rank': rank,
-                        'combination_id': combo['combination_id'],
-                        'average_uniqueness': combo['average_uniqueness'],
-                        'best_uniqueness_score': combo['best_uniqueness_score'],
-                        'user_agent': config['user_agent'],
-                        'screen_resolution': config['screen_resolution'],
-                        'timezone': config['timezone'],
-                        'language': config['language'],
-                        'platform': config['platform'],
-                        'webgl_vendor': config['webgl_vendor'],
-                        'webgl_renderer': config['webgl_renderer'],
-                        'hardware_concurrency': config['hardware_concurrency'],
-                        'device_memory': config['device_memory'],
-                        'fonts_list': '|'.join(config['fonts'][:20]),  # First 20 fonts
-                        'full_config_json': json.dumps(config)
-                    }
-                    writer.writerow(row)
+                    config = combo.fingerprint_config
+                    ua, res, tz, lang, plat, _, _, wv, wr, hc, dm, _, _, _ = _get_cfg(config)
+                    head = f"{rank},{combo.combination_id},{combo.average_uniqueness},{combo.best_uniqueness_score},"
+                    tail_writer.writerow((
+                        ua, res, tz, lang, plat, wv, wr, hc, dm,
+                        '|'.join(config['fonts'][:20]),  # First 20 fonts
+                        # The derived counts are bookkeeping, not part of the fingerprint
+                        _dumps({key: value for key, value in config.items() if key != '_derived'})
+                    ))
+                    csvfile.write(head.encode() + tail_buf.getvalue().encode('utf-8'))
+                    tail_buf.seek(0)
+                    tail_buf.truncate()
             
             print(f"💾 Saved top {len(best_combinations)} combinations to {best_csv}")
     
@@ -882,6 +1198,13 @@ class AdvancedFingerprintTester:
         print("4. Monitor your uniqueness periodically as web tracking evolves")
         print("\n⚠️  IMPORTANT: Use responsibly and respect website terms of service")
 
+def _shard_entry(shard):
+    """Process pool entry point: test one shard of combinations in a fresh event loop"""
+    data, combinations, max_concurrent, headless, total, run_tag, csv_buffering = shard
+    tester = AdvancedFingerprintTester(csv_buffering)
+    tester.index_data(data)
+    return asyncio.run(tester._run_shard(combinations, max_concurrent, headless, total, run_tag))
+
 # Enhanced main execution
 if __name__ == "__main__":
     tester = AdvancedFingerprintTester()
@@ -895,6 +1218,8 @@ if __name__ == "__main__":
     # Configuration - Adjust 1  these values
     MAX_COMBINATIONS = 75    # Number of combinations to test
     MAX_CONCURRENT = 1  
+    PROCESSES = 1            # More than 1 runs shards in separate processes, each with its own browser
+    HEADLESS = '--headed' not in sys.argv  # Headed mode is for debugging only
     
     print(f"⚙️  Configuration:")
     print(f"   📊 Testing {MAX_COMBINATIONS} combinations")
@@ -904,7 +1229,10 @@ if __name__ == "__main__":
     
     # Run the advanced tests
     try:
-        asyncio.run(tester.run_advanced_tests(MAX_COMBINATIONS, MAX_CONCURRENT))
+        if PROCESSES > 1:
+            tester.run_multiproc(MAX_COMBINATIONS, PROCESSES, MAX_CONCURRENT, HEADLESS)
+        else:
+            asyncio.run(tester.run_advanced_tests(MAX_COMBINATIONS, MAX_CONCURRENT, HEADLESS))
         tester.print_usage_instructions()
     except KeyboardInterrupt:
         print("\n⏹️  Testing interrupted by user")
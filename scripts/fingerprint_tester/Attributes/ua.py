@@ -1,101 +1,135 @@
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+from _launch import ANTI_DETECT_ARGS
+import asyncio
 import time
 import json
 
-def test_user_agent_amiunique(user_agent, custom_product=None, custom_product_sub=None, custom_app_name=None):
+# Navigator override hook, filled in with a JSON object of property values
+_INIT_JS = """(cfg => {
+    for (const [k, v] of Object.entries(cfg)) {
+        Object.defineProperty(navigator, k, {get: () => v, configurable: true});
+    }
+    console.log('Navigator properties overridden:', JSON.stringify(cfg));
+})(%s)"""
+
+async def _test_on_browser(browser, user_agent, custom_product=None, custom_product_sub=None, custom_app_name=None,
+                           interactive=False, wait_timeout_ms=15000):
     """
-    Test a custom user agent and navigator properties on AmIUnique website using Playwright
+    Run one AmIUnique test in a fresh context of an already launched browser
     """
-    with sync_playwright() as p:
-        # Launch browser with custom user agent
-        browser = p.chromium.launch(headless=False)  # Set to True for headless mode
-        context = browser.new_context(user_agent=user_agent)
-        page = context.new_page()
+    context = await browser.new_context(user_agent=user_agent)
+    page = await context.new_page()
+    
+    # Override navigator properties before any page loads; the values go in
+    # as a JSON payload so they can never break out of the script
+    overrides = {
+        "product": custom_product or "Gecko",
+        "productSub": custom_product_sub or "20100101",
+        "appName": custom_app_name or "Netscape",
+    }
+    await page.add_init_script(_INIT_JS % json.dumps(overrides))
+    
+    try:
+        print(f"Testing User-Agent: {user_agent}")
+        print(f"Custom Product: {custom_product or 'Gecko'}")
+        print(f"Custom ProductSub: {custom_product_sub or '20100101'}")
+        print(f"Custom AppName: {custom_app_name or 'Netscape'}")
+        print("Opening AmIUnique...")
         
-        # Override navigator properties before any page loads
-        navigator_override = f"""
-        Object.defineProperty(navigator, 'product', {{
-            get: () => '{custom_product or "Gecko"}',
-            configurable: true
-        }});
+        # Go to AmIUnique
+        await page.goto("https://amiunique.org/fingerprint")
         
-        Object.defineProperty(navigator, 'productSub', {{
-            get: () => '{custom_product_sub or "20100101"}',
-            configurable: true
-        }});
+        # Wait for the fingerprint table instead of a fixed sleep
+        await page.wait_for_selector(".fp-details tr", timeout=wait_timeout_ms)
         
-        Object.defineProperty(navigator, 'appName', {{
-            get: () => '{custom_app_name or "Netscape"}',
-            configurable: true
-        }});
+        # Verify our navigator overrides worked
+        actual_product = await page.evaluate("navigator.product")
+        actual_product_sub = await page.evaluate("navigator.productSub")
+        actual_app_name = await page.evaluate("navigator.appName")
         
-        console.log('Navigator properties overridden:');
-        console.log('Product:', navigator.product);
-        console.log('ProductSub:', navigator.productSub);
-        console.log('AppName:', navigator.appName);
-        """
+        print(f"\n=== ACTUAL NAVIGATOR VALUES ===")
+        print(f"navigator.product: {actual_product}")
+        print(f"navigator.productSub: {actual_product_sub}")
+        print(f"navigator.appName: {actual_app_name}")
+        print(f"navigator.userAgent: {await page.evaluate('navigator.userAgent')}")
         
-        # Add script to override navigator properties
-        page.add_init_script(navigator_override)
         
-        try:
-            print(f"Testing User-Agent: {user_agent}")
-            print(f"Custom Product: {custom_product or 'Gecko'}")
-            print(f"Custom ProductSub: {custom_product_sub or '20100101'}")
-            print(f"Custom AppName: {custom_app_name or 'Netscape'}")
-            print("Opening AmIUnique...")
-            
-            # Go to AmIUnique
-            page.goto("https://amiunique.org/fingerprint")
-            
-            # Wait for the page to load
-            time.sleep(3)
-            
-            # Verify our navigator overrides worked
-            actual_product = page.evaluate("navigator.product")
-            actual_product_sub = page.evaluate("navigator.productSub")
-            actual_app_name = page.evaluate("navigator.appName")
-            
-            print(f"\n=== ACTUAL NAVIGATOR VALUES ===")
-            print(f"navigator.product: {actual_product}")
-            print(f"navigator.productSub: {actual_product_sub}")
-            print(f"navigator.appName: {actual_app_name}")
-            print(f"navigator.userAgent: {page.evaluate('navigator.userAgent')}")
-            
-            
-            # Extract fingerprint data
-            print("\n=== FINGERPRINT RESULTS ===")
-            
-            # Get all fingerprint attribute rows
-            rows = page.query_selector_all(".fp-details tr")
-            
-            for row in rows:
-                try:
-                    attribute = row.query_selector("td:first-child").inner_text()
-                    value = row.query_selector("td:nth-child(2)").inner_text()
-                    percentage = row.query_selector("td:nth-child(3)").inner_text()
-                    
-                    print(f"{attribute}: {value} ({percentage})")
-                    
-                    # Highlight the Product attribute specifically
-                    if "Product" in attribute:
-                        print(f"*** PRODUCT DETECTED: {value} ***")
-                        
-                except Exception as e:
-                    continue
-            
-            # Take a screenshot for reference
-            page.screenshot(path=f"amiunique_test_{int(time.time())}.png")
-            print(f"\nScreenshot saved as: amiunique_test_{int(time.time())}.png")
-            
-            # Wait a bit to see results
-            input("\nPress Enter to close browser...")
+        # Extract fingerprint data
+        print("\n=== FINGERPRINT RESULTS ===")
+        
+        # Get all fingerprint attribute rows in a single round-trip; header and
+        # malformed rows without three data cells are dropped in the page
+        rows = await page.evaluate("""() =>
+            Array.from(document.querySelectorAll('.fp-details tr'))
+                .map(r => r.querySelectorAll('td'))
+                .filter(t => t.length >= 3)
+                .map(t => [t[0].innerText || '', t[1].innerText || '', t[2].innerText || ''])
+        """)
+        
+        for attribute, value, percentage in rows:
+            print(f"{attribute}: {value} ({percentage})")
             
-        except Exception as e:
-            print(f"Error: {e}")
+            # Highlight the Product attribute specifically
+            if "Product" in attribute:
+                print(f"*** PRODUCT DETECTED: {value} ***")
+        
+        # Take a screenshot for reference
+        screenshot_path = f"amiunique_test_{int(time.time() * 1000)}.png"
+        await page.screenshot(path=screenshot_path)
+        print(f"\nScreenshot saved as: {screenshot_path}")
         
+        # Keep the browser open to inspect the results
+        if interactive:
+            await asyncio.to_thread(input, "\nPress Enter to close browser...")
+        
+        return rows
+        
+    except Exception as e:
+        print(f"Error: {e}")
+    
+    finally:
+        await context.close()
+
+async def test_user_agent_amiunique(user_agent, custom_product=None, custom_product_sub=None, custom_app_name=None,
+                                    headless=True, interactive=False, wait_timeout_ms=15000):
+    """
+    Test a custom user agent and navigator properties on AmIUnique website using Playwright
+    """
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless, args=list(ANTI_DETECT_ARGS))  # Pass headless=False to watch the test
+        try:
+            return await _test_on_browser(browser, user_agent, custom_product, custom_product_sub, custom_app_name,
+                                          interactive, wait_timeout_ms)
+        finally:
+            await browser.close()
+
+def test_user_agent_amiunique_sync(*args, **kwargs):
+    """
+    Blocking wrapper around test_user_agent_amiunique
+    """
+    return asyncio.run(test_user_agent_amiunique(*args, **kwargs))
+
+async def run_batch(configs, max_parallel=4, headless=True, wait_timeout_ms=15000):
+    """
+    Test several configurations concurrently on one shared browser, one context each.
+    Each config is a dict with user_agent and optional product, product_sub and app_name.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless, args=list(ANTI_DETECT_ARGS))
+        
+        async def _one(config):
+            async with semaphore:
+                return await _test_on_browser(
+                    browser, config["user_agent"], config.get("product"), config.get("product_sub"),
+                    config.get("app_name"), wait_timeout_ms=wait_timeout_ms
+                )
+        
+        try:
+            return await asyncio.gather(*[_one(config) for config in configs])
         finally:
-            browser.close()
+            await browser.close()
 
 def main():
     """
@@ -181,8 +215,8 @@ def main():
         print("No user agent provided. Exiting.")
         return
     
-    # Run the test
-    test_user_agent_amiunique(user_agent, product, product_sub, app_name)
+    # Run the test in a visible browser so the results can be inspected
+    test_user_agent_amiunique_sync(user_agent, product, product_sub, app_name, headless=False, interactive=True)
 
 if __name__ == "__main__":
     # Installation reminder
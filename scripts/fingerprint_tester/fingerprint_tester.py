@@ -1,14 +1,154 @@
 import asyncio
 import random
 import csv
-import json
+from array import array
 from pathlib import Path
-from playwright.async_api import async_playwright
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from Attributes._launch import RANDOM_BYTES_JS, TRIMMED_ARGS, _dumps, apply_emulation, reset_context
 import itertools
 from datetime import datetime
 import time
+import re
+import os
+import logging
+import logging.handlers
+
+# Per-combination progress goes through this logger; set FP_LOG=INFO or
+# FP_LOG=DEBUG to see it, errors are shown by default
+log = logging.getLogger('fp_tester')
+_log_level = os.environ.get('FP_LOG', 'WARNING').upper()
+log.setLevel(_log_level if isinstance(logging.getLevelName(_log_level), int) else logging.WARNING)
+
+# Fingerprint overrides, added once per pooled context. Values are read from
+# window.__fp, which each page installs before navigating; the getters read it
+# lazily, so the order the two init scripts run in does not matter.
+FP_SCRIPT = RANDOM_BYTES_JS + """
+    Object.defineProperty(navigator, 'platform', {
+        get: () => window.__fp.platform
+    });
+    
+    // Override more fingerprinting vectors
+    Object.defineProperty(navigator, 'hardwareConcurrency', {
+        get: () => window.__fp.hc
+    });
+    
+    Object.defineProperty(navigator, 'deviceMemory', {
+        get: () => window.__fp.mem
+    });
+    
+    Object.defineProperty(screen, 'colorDepth', {
+        get: () => window.__fp.colorDepth
+    });
+    
+    // WebGL fingerprinting
+    const getParameter = WebGLRenderingContext.prototype.getParameter;
+    WebGLRenderingContext.prototype.getParameter = function(parameter) {
+        if (parameter === 37445) { // UNMASKED_VENDOR_WEBGL
+            return window.__fp.vendor;
+        }
+        if (parameter === 37446) { // UNMASKED_RENDERER_WEBGL
+            return window.__fp.renderer;
+        }
+        return getParameter.call(this, parameter);
+    };
+    
+    // Canvas fingerprinting protection
+    const getContext = HTMLCanvasElement.prototype.getContext;
+    HTMLCanvasElement.prototype.getContext = function(type) {
+        const context = getContext.call(this, type);
+        if (type === '2d') {
+            const getImageData = context.getImageData;
+            context.getImageData = function(...args) {
+                const imageData = getImageData.apply(this, args);
+                // Add slight noise to the red channel from one random byte per pixel
+                const data = imageData.data;
+                const noise = randomBytes(data.length >> 2);
+                // Uint8ClampedArray clamps to 0-255 on assignment
+                for (let i = 0, j = 0; i < data.length; i += 4, j++) {
+                    data[i] += noise[j] % 3 - 1;
+                }
+                return imageData;
+            };
+        }
+        return context;
+    };
+"""
+
+# Page-side extractors passed to page.evaluate
+_AMIUNIQUE_JS = """
+    () => {
+        const data = {};
+        // Try to extract various metrics from the page
+        const uniquenessEl = document.querySelector('.uniqueness');
+        if (uniquenessEl) {
+            data.uniqueness = uniquenessEl.textContent.trim();
+        }
+        return {
+            uniqueness: uniquenessEl ? uniquenessEl.innerText : null,
+            data: data
+        };
+    }
+"""
+
+_EFF_JS = """
+    () => {
+        const data = {};
+        // Look for tracking protection indicators
+        const results = document.querySelectorAll('.result, .test-result');
+        results.forEach((result, index) => {
+            data[`result_${index}`] = result.textContent.trim();
+        });
+        return data;
+    }
+"""
+
+# Image and media URLs blocked on sites whose results are read as text only.
+# Patterns match the whole URL, so each extension also gets a query string form
+_BLOCKED_MEDIA_URLS = [
+    pattern
+    for ext in ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'mp4', 'webm', 'mp3', 'ogg')
+    for pattern in (f'*.{ext}', f'*.{ext}?*')
+]
+
+class CombinationTable:
+    """Generated combinations as parallel index arrays into shared value pools"""
+    
+    def __init__(self, pools):
+        self.pools = pools
+        self.columns = {field: array('I') for field in pools}
+    
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+    
+    def append(self, indices):
+        for column, index in zip(self.columns.values(), indices):
+            column.append(index)
+    
+    def __getitem__(self, i):
+        # Combinations are only materialised as dicts while they are tested
+        return {field: self.pools[field][column[i]] for field, column in self.columns.items()}
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
 
 class FingerprintTester:
+    # Common values per weighted category and the total chance of picking one of them
+    WEIGHTED_CATEGORIES = {
+        'screen_resolutions': (['1920x1080', '1366x768', '1280x720'], 0.3),
+        'timezones': (['America/New_York', 'Europe/London', 'America/Los_Angeles'], 0.25),
+        'languages': (['en-US,en;q=0.9', 'en-GB,en;q=0.9'], 0.2)
+    }
+    
+    _UNIQ_RE = re.compile(r'unique|identifiable|fingerprint|tracking', re.IGNORECASE)
+    
+    CSV_FIELDNAMES = [
+        'combination_id', 'timestamp', 'is_unique',
+        'user_agents', 'screen_resolutions', 'timezones',
+        'languages', 'platforms', 'test_results_json'
+    ]
+    
     def __init__(self):
         self.data_files = {
             'user_agents': 'user_agents.txt',
@@ -19,56 +159,113 @@ class FingerprintTester:
         }
         self.combinations = []
         self.unique_combinations = []
+        self._buckets = {}
+        self._alias = {}
+        # Site-specific result extractors; other sites use extract_generic_data
+        self._extractors = {
+            'amiunique': self.extract_amiunique_data,
+            'coveryourtracks': self.extract_eff_data
+        }
         
     def load_data_files(self):
         """Load all data from .txt files"""
         data = {}
         for key, filename in self.data_files.items():
             try:
-                with open(filename, 'r', encoding='utf-8') as file:
-                    # Remove empty lines and strip whitespace
-                    data[key] = [line.strip() for line in file.readlines() if line.strip()]
+                # Read in one go, then strip whitespace and drop empty lines
+                lines = Path(filename).read_text(encoding='utf-8').splitlines()
+                data[key] = [line for line in map(str.strip, lines) if line]
                 print(f"✅ Loaded {len(data[key])} {key} from {filename}")
             except FileNotFoundError:
                 print(f"❌ File {filename} not found! Creating sample file...")
                 self.create_sample_file(filename, key)
                 data[key] = self.get_sample_data(key)
+        
+        # Resolutions are parsed once into (label, width, height)
+        data['screen_resolutions'] = [
+            (resolution, *map(int, resolution.split('x'))) for resolution in data['screen_resolutions']
+        ]
+        
+        # Each weighted category is split into its common and uncommon buckets
+        # once per run, and its alias table is built from them so each
+        # weighted draw is O(1)
+        self._buckets = {}
+        self._alias = {}
+        for category, (common_values, _) in self.WEIGHTED_CATEGORIES.items():
+            self._buckets[category] = self.partition_weighted(data[category], common_values)
+            self._alias[category] = (data[category], *self.build_alias_table(category))
         return data 
    
     
     def get_weighted_resolution(self, resolutions):
         """Favor less common screen resolutions"""
-        common_resolutions = ['1920x1080', '1366x768', '1280x720']
-        uncommon_resolutions = [r for r in resolutions if r not in common_resolutions]
-        
-        # 30% chance of common, 70% chance of uncommon
-        if random.random() < 0.3 and common_resolutions:
-            return random.choice([r for r in common_resolutions if r in resolutions])
-        else:
-            return random.choice(uncommon_resolutions if uncommon_resolutions else resolutions)
+        return self.sample_weighted('screen_resolutions', resolutions)[0]
     
     def get_weighted_timezone(self, timezones):
         """Favor less common timezones"""
-        common_timezones = ['America/New_York', 'Europe/London', 'America/Los_Angeles']
-        uncommon_timezones = [t for t in timezones if t not in common_timezones]
-        
-        # 25% chance of common, 75% chance of uncommon
-        if random.random() < 0.25 and common_timezones:
-            return random.choice([t for t in common_timezones if t in timezones])
-        else:
-            return random.choice(uncommon_timezones if uncommon_timezones else timezones)
+        return self.sample_weighted('timezones', timezones)[0]
     
     def get_weighted_language(self, languages):
         """Favor less common language combinations"""
-        common_languages = ['en-US,en;q=0.9', 'en-GB,en;q=0.9']
-        uncommon_languages = [l for l in languages if l not in common_languages]
-        
-        # 20% chance of common, 80% chance of uncommon
-        if random.random() < 0.2 and common_languages:
-            return random.choice([l for l in common_languages if l in languages])
+        return self.sample_weighted('languages', languages)[0]
+    
+    def partition_weighted(self, values, common_values):
+        """Split a category's values into its common and uncommon buckets"""
+        # Resolutions are (label, width, height) tuples and match on their label
+        labels = [value[0] if isinstance(value, tuple) else value for value in values]
+        by_label = dict(zip(labels, values))
+        return {
+            'common': [by_label[label] for label in common_values if label in by_label],
+            'uncommon': [value for value, label in zip(values, labels) if label not in common_values]
+        }
+    
+    def build_alias_table(self, category):
+        """Build a Vose alias table from a category's buckets, giving the common one its weight in total"""
+        common, uncommon = self._buckets[category]['common'], self._buckets[category]['uncommon']
+        common_weight = self.WEIGHTED_CATEGORIES[category][1]
+        items = common + uncommon
+        # With only one bucket present, its values are drawn uniformly
+        if not common or not uncommon:
+            weights = [1.0] * len(items)
         else:
-            return random.choice(uncommon_languages if uncommon_languages else languages)
+            weights = ([common_weight / len(common)] * len(common) +
+                       [(1 - common_weight) / len(uncommon)] * len(uncommon))
+        
+        # Scale to an average of 1, then pair each underfull slot with an overfull one
+        n = len(items)
+        total = sum(weights)
+        scaled = [weight * n / total for weight in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], l
+            scaled[l] += scaled[s] - 1
+            (small if scaled[l] < 1 else large).append(l)
+        return items, prob, alias
+    
+    def get_alias_table(self, category, values):
+        """Return (values, items, prob, alias) for a weighted category"""
+        table = self._alias.get(category)
+        if table is None or table[0] is not values:
+            # Only a list other than the loaded one needs partitioning here
+            self._buckets[category] = self.partition_weighted(values, self.WEIGHTED_CATEGORIES[category][0])
+            table = self._alias[category] = (values, *self.build_alias_table(category))
+        return table
+    
+    def sample_weighted_indices(self, category, values, k=1):
+        """Draw k indices into the alias table items of a weighted category, each in O(1)"""
+        _, items, prob, alias = self.get_alias_table(category, values)
+        rand = random.random
+        return [i if rand() < prob[i] else alias[i]
+                for i in random.choices(range(len(items)), k=k)]
     
+    def sample_weighted(self, category, values, k=1):
+        """Draw k values for a weighted category"""
+        items = self.get_alias_table(category, values)[1]
+        return [items[i] for i in self.sample_weighted_indices(category, values, k)]
     
     def create_sample_file(self, filename, data_type):
         """Create sample files if they don't exist"""
@@ -103,153 +300,137 @@ class FingerprintTester:
     
     def generate_combinations(self, data, max_combinations=1000):
         """Generate strategic combinations more likely to be unique"""
-        combinations = []
-
-        # Generate combinations with bias toward uniqueness
-        for _ in range(max_combinations):
-            # Use weighted selection for rarer combinations
-            combo = {
-                'user_agents': random.choice(data['user_agents']),
-                'screen_resolutions': self.get_weighted_resolution(data['screen_resolutions']),
-                'timezones': self.get_weighted_timezone(data['timezones']),
-                'languages': self.get_weighted_language(data['languages']),
-                'platforms': random.choice(data['platforms'])
-            }
+        # Combinations are stored as index arrays into these value pools;
+        # weighted categories index into their alias table items
+        pools = {
+            'user_agents': data['user_agents'],
+            'screen_resolutions': self.get_alias_table('screen_resolutions', data['screen_resolutions'])[1],
+            'timezones': self.get_alias_table('timezones', data['timezones'])[1],
+            'languages': self.get_alias_table('languages', data['languages'])[1],
+            'platforms': data['platforms'],
+            'hardware_concurrency': list(range(2, 17)),
+            'device_memory': [2, 4, 8, 16],
+            'color_depth': [24, 30, 32],
+            'webgl_vendor': ["NVIDIA Corporation", "AMD", "Intel Inc.", "Apple Inc."],
+            'webgl_renderer': ["GeForce GTX 1060", "Radeon RX 580", "Intel Iris Pro", "Apple M1"]
+        }
+        combinations = CombinationTable(pools)
+        seen = set()
 
-            # Avoid exact duplicates
-            if combo not in combinations:
-                combinations.append(combo)
+        # Every random decision is drawn for the whole batch up front, using
+        # weighted selection for rarer resolutions, timezones and languages
+        n = max_combinations
+        weighted = self.WEIGHTED_CATEGORIES
+        columns = zip(*(
+            self.sample_weighted_indices(field, data[field], n) if field in weighted
+            else random.choices(range(len(pool)), k=n)
+            for field, pool in pools.items()
+        ))
+        
+        ua_pool, res_pool, tz_pool, lang_pool, plat_pool = (
+            pools['user_agents'], pools['screen_resolutions'], pools['timezones'],
+            pools['languages'], pools['platforms']
+        )
+        for indices in columns:
+            ua_i, res_i, tz_i, lang_i, plat_i = indices[:5]
+            
+            # Avoid exact duplicates; a set of value tuples keeps this O(1)
+            key = (ua_pool[ua_i], res_pool[res_i], tz_pool[tz_i], lang_pool[lang_i], plat_pool[plat_i])
+            if key in seen:
+                continue
+            seen.add(key)
+            combinations.append(indices)
 
         return combinations
     
-    async def test_combination(self, browser, combination, test_sites):
+    async def apply_page_fingerprint(self, context, page, combination):
+        """Emulate a combination's browser-level settings on a page of a pooled context; returns its CDP session"""
+        _, width, height = combination['screen_resolutions']
+        return await apply_emulation(
+            context, page, combination['user_agents'], combination['languages'], combination['platforms'],
+            combination['timezones'], width, height
+        )
+    
+    async def test_combination(self, context, combination, test_sites):
         """Test a single combination against fingerprinting sites"""
         try:
-            # Parse screen resolution
-            width, height = map(int, combination['screen_resolutions'].split('x'))
-            
-            # Create context with fingerprint settings
-            context = await browser.new_context(
-                user_agent=combination['user_agents'],
-                viewport={'width': width, 'height': height},
-                locale=combination['languages'].split(',')[0],
-                timezone_id=combination['timezones'],
-                extra_http_headers={
-                    'Accept-Language': combination['languages']
-                }
-            )
-            
-            page = await context.new_page()
-            
-            # Override platform if needed
-            await page.add_init_script(f"""
-                Object.defineProperty(navigator, 'platform', {{
-                    get: () => '{combination['platforms']}'
-                }});
-            """)
-            
-            # Add this after the platform override
-            await page.add_init_script(f"""
-                // Override more fingerprinting vectors
-                Object.defineProperty(navigator, 'hardwareConcurrency', {{
-                    get: () => {random.randint(2, 16)}
-                }});
-                
-                Object.defineProperty(navigator, 'deviceMemory', {{
-                    get: () => {random.choice([2, 4, 8, 16])}
-                }});
-                
-                Object.defineProperty(screen, 'colorDepth', {{
-                    get: () => {random.choice([24, 30, 32])}
-                }});
-                
-                // WebGL fingerprinting
-                const getParameter = WebGLRenderingContext.prototype.getParameter;
-                WebGLRenderingContext.prototype.getParameter = function(parameter) {{
-                    if (parameter === 37445) {{ // UNMASKED_VENDOR_WEBGL
-                        return '{random.choice(["NVIDIA Corporation", "AMD", "Intel Inc.", "Apple Inc."])}';
-                    }}
-                    if (parameter === 37446) {{ // UNMASKED_RENDERER_WEBGL  
-                        return '{random.choice(["GeForce GTX 1060", "Radeon RX 580", "Intel Iris Pro", "Apple M1"])}';
-                    }}
-                    return getParameter.call(this, parameter);
-                }};
-                
-                // Canvas fingerprinting protection
-                const getContext = HTMLCanvasElement.prototype.getContext;
-                HTMLCanvasElement.prototype.getContext = function(type) {{
-                    const context = getContext.call(this, type);
-                    if (type === '2d') {{
-                        const getImageData = context.getImageData;
-                        context.getImageData = function(...args) {{
-                            const imageData = getImageData.apply(this, args);
-                            // Add slight noise to canvas
-                            for (let i = 0; i < imageData.data.length; i += 4) {{
-                                imageData.data[i] += Math.floor(Math.random() * 3) - 1;
-                            }}
-                            return imageData;
-                        }};
-                    }}
-                    return context;
-                }};
-            """)
-            
-            results = {}
+            # FP_SCRIPT is already on the pooled context; only the values it
+            # reads from window.__fp change per combination
+            fp_config = {
+                'platform': combination['platforms'],
+                'hc': combination['hardware_concurrency'],
+                'mem': combination['device_memory'],
+                'colorDepth': combination['color_depth'],
+                'vendor': combination['webgl_vendor'],
+                'renderer': combination['webgl_renderer']
+            }
+            fp_script = f"window.__fp = {_dumps(fp_config)};"
             
-            for site_name, site_config in test_sites.items():
+            async def _one_site(site_name, site_config):
+                # Each site gets its own page so all sites load concurrently
+                page = await context.new_page()
                 try:
-                    print(f"  🔍 Testing {site_name}...")
-                    await page.goto(site_config['url'], wait_until='networkidle')
-                    
-                    # Wait for the site to load and analyze
-                    await page.wait_for_timeout(site_config.get('wait_time', 5000))
+                    log.debug("  🔍 Testing %s...", site_name)
+                    cdp = await self.apply_page_fingerprint(context, page, combination)
+                    await page.add_init_script(script=fp_script)
+                    if site_config.get('block_images'):
+                        # Blocked in the browser itself; a page.route handler would
+                        # send every request through Python and disable the HTTP cache
+                        await cdp.send('Network.enable')
+                        await cdp.send('Network.setBlockedURLs', {'urls': _BLOCKED_MEDIA_URLS})
+                    await page.goto(site_config['url'], wait_until='domcontentloaded')
                     
-                    # Extract uniqueness data based on site
-                    if site_name == 'amiunique':
-                        uniqueness_data = await self.extract_amiunique_data(page)
-                    elif site_name == 'coveryourtracks':
-                        uniqueness_data = await self.extract_eff_data(page)
+                    # Wait for the site's results to render, or a fixed time if
+                    # it has no known result element. Extraction is best-effort,
+                    # so it still runs on whatever rendered if the wait times out
+                    timed_out = False
+                    if 'result_selector' in site_config:
+                        try:
+                            await page.wait_for_selector(site_config['result_selector'], timeout=15000)
+                        except PlaywrightTimeoutError:
+                            log.debug("    ⏳ %s results did not appear, extracting anyway", site_name)
+                            timed_out = True
                     else:
-                        uniqueness_data = await self.extract_generic_data(page)
-                    
-                    results[site_name] = uniqueness_data
+                        await page.wait_for_timeout(site_config.get('wait_time', 5000))
                     
-                    # Small delay between tests
-                    await page.wait_for_timeout(2000)
+                    # Extract uniqueness data based on site
+                    extractor = self._extractors.get(site_name, self.extract_generic_data)
+                    result = await extractor(page)
+                    if timed_out:
+                        result['timed_out'] = True
+                    return result
                     
                 except Exception as e:
-                    print(f"    ❌ Error testing {site_name}: {str(e)}")
-                    results[site_name] = {'error': str(e)}
+                    log.warning("    ❌ Error testing %s: %s", site_name, e)
+                    return {'error': str(e)}
+                finally:
+                    await page.close()
+            
+            outcomes = await asyncio.gather(
+                *(_one_site(site_name, site_config) for site_name, site_config in test_sites.items()),
+                return_exceptions=True
+            )
+            results = {
+                site_name: {'error': str(outcome)} if isinstance(outcome, Exception) else outcome
+                for site_name, outcome in zip(test_sites, outcomes)
+            }
             
-            await context.close()
             return results
             
         except Exception as e:
-            print(f"  ❌ Error with combination: {str(e)}")
+            log.warning("  ❌ Error with combination: %s", e)
             return {'error': str(e)}
         
     async def extract_amiunique_data(self, page):
         """Extract uniqueness data from AmIUnique"""
         try:
-            # Wait for results to load
-            await page.wait_for_selector('.uniqueness', timeout=10000)
-            
-            # Extract uniqueness percentage
-            uniqueness_element = await page.query_selector('.uniqueness')
-            uniqueness_text = await uniqueness_element.inner_text() if uniqueness_element else "0%"
-            
-            # Extract other metrics if available
-            fingerprint_data = await page.evaluate('''
-                () => {
-                    const data = {};
-                    // Try to extract various metrics from the page
-                    const uniquenessEl = document.querySelector('.uniqueness');
-                    if (uniquenessEl) {
-                        data.uniqueness = uniquenessEl.textContent.trim();
-                    }
-                    return data;
-                }
-            ''')
+            # Extract the uniqueness percentage and other metrics in one round-trip
+            extracted = await page.evaluate(_AMIUNIQUE_JS)
+            uniqueness_text = extracted['uniqueness']
+            if uniqueness_text is None:
+                # The page never rendered a result, which is not a 0% measurement
+                return {'error': 'AmIUnique extraction failed: no .uniqueness element'}
+            fingerprint_data = extracted['data']
             
             return {
                 'uniqueness': uniqueness_text,
@@ -262,21 +443,8 @@ class FingerprintTester:
     async def extract_eff_data(self, page):
         """Extract uniqueness data from EFF Cover Your Tracks"""
         try:
-            # Wait for results
-            await page.wait_for_timeout(8000)
-            
             # Extract tracking protection results
-            tracking_data = await page.evaluate('''
-                () => {
-                    const data = {};
-                    // Look for tracking protection indicators
-                    const results = document.querySelectorAll('.result, .test-result');
-                    results.forEach((result, index) => {
-                        data[`result_${index}`] = result.textContent.trim();
-                    });
-                    return data;
-                }
-            ''')
+            tracking_data = await page.evaluate(_EFF_JS)
             
             # Determine if fingerprint is unique based on EFF's results
             is_unique = any('unique' in str(value).lower() for value in tracking_data.values())
@@ -295,9 +463,8 @@ class FingerprintTester:
             # Generic approach - look for common indicators
             content = await page.content()
             
-            # Look for uniqueness indicators in the page content
-            uniqueness_keywords = ['unique', 'identifiable', 'fingerprint', 'tracking']
-            is_unique = any(keyword in content.lower() for keyword in uniqueness_keywords)
+            # Look for uniqueness indicators without lowercasing a copy of the page
+            is_unique = self._UNIQ_RE.search(content) is not None
             
             return {
                 'content_length': len(content),
@@ -322,14 +489,18 @@ class FingerprintTester:
         test_sites = {
             'amiunique': {
                 'url': 'https://amiunique.org/fp',
-                'wait_time': 8000
+                'result_selector': '.uniqueness'
             },
             'coveryourtracks': {
                 'url': 'https://coveryourtracks.eff.org/',
-                'wait_time': 10000
+                'result_selector': '.result, .test-result',
+                'block_images': True  # Only the result text is read here
             }
         }
         
+        # Cleared by reset_context after each combination
+        site_origins = [f"{url.scheme}://{url.netloc}" for url in (urlparse(site['url']) for site in test_sites.values())]
+        
         print(f"\n🧪 Testing {len(combinations)} combinations on {len(test_sites)} sites")
         print(f"🔄 Running {max_concurrent} tests concurrently")
         print("=" * 60)
@@ -338,104 +509,119 @@ class FingerprintTester:
             # Launch browser
             browser = await playwright.chromium.launch(
                 headless=True,  # Set to False if you want to see the browser
-                args=['--no-sandbox', '--disable-blink-features=AutomationControlled']
+                args=list(TRIMMED_ARGS)
             )
             
-            # Process combinations in batches
-            unique_combinations = []
-            semaphore = asyncio.Semaphore(max_concurrent)
+            # Unique combinations are written as they are found; the file is
+            # created on the first one
+            csv_filename = f"unique_fingerprints_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            csvfile = writer = None
+            unique_count = 0
             
-            async def test_single_combination(combo_index, combination):
-                async with semaphore:
-                    print(f"\n🔄 Testing combination {combo_index + 1}/{len(combinations)}")
-                    print(f"   UA: {combination['user_agents'][:50]}...")
-                    print(f"   Resolution: {combination['screen_resolutions']}")
-                    print(f"   Timezone: {combination['timezones']}")
-                    
-                    results = await self.test_combination(browser, combination, test_sites)
-                    
-                    # Determine if combination is unique
-                    is_unique = False
-                    uniqueness_scores = []
-                    
-                    for site, result in results.items():
-                        if 'error' not in result:
-                            if result.get('is_unique', False):
-                                is_unique = True
-                            if 'uniqueness' in result:
-                                uniqueness_scores.append(result['uniqueness'])
-                    
-                    if is_unique:
-                        combination_result = {
-                            'combination_id': combo_index + 1,
-                            'timestamp': datetime.now().isoformat(),
-                            'is_unique': True,
-                            'test_results': results,
-                            **combination
-                        }
-                        unique_combinations.append(combination_result)
-                        print(f"   ✅ UNIQUE combination found! (Total unique: {len(unique_combinations)})")
-                    else:
-                        print(f"   ❌ Not unique")
-                    
-                    # Small delay between tests to be respectful
-                    await asyncio.sleep(1)
+            def save_result(row):
+                # No await in here, so concurrent workers cannot interleave rows
+                nonlocal csvfile, writer, unique_count
+                if writer is None:
+                    csvfile = open(csv_filename, 'w', newline='', encoding='utf-8')
+                    writer = csv.DictWriter(csvfile, fieldnames=self.CSV_FIELDNAMES)
+                    writer.writeheader()
+                writer.writerow(row)
+                csvfile.flush()
+                unique_count += 1
             
-            # Run all tests
-            tasks = [
-                test_single_combination(i, combo) 
-                for i, combo in enumerate(combinations)
-            ]
+            # Contexts are expensive to bootstrap, so each worker creates one
+            # up front and reuses it for every combination it tests
+            contexts = []
+            for _ in range(max_concurrent):
+                context = await browser.new_context()
+                await context.add_init_script(script=FP_SCRIPT)
+                contexts.append(context)
             
-            await asyncio.gather(*tasks, return_exceptions=True)
+            async def test_single_combination(context, combo_index, combination):
+                log.info("🔄 Testing combination %d/%d", combo_index + 1, len(combinations))
+                log.debug("   UA: %.50s...", combination['user_agents'])
+                log.debug("   Resolution: %s", combination['screen_resolutions'][0])
+                log.debug("   Timezone: %s", combination['timezones'])
+                
+                results = await self.test_combination(context, combination, test_sites)
+                
+                # Determine if combination is unique
+                is_unique = False
+                uniqueness_scores = []
+                
+                for site, result in results.items():
+                    if 'error' not in result:
+                        if result.get('is_unique', False):
+                            is_unique = True
+                        if 'uniqueness' in result:
+                            uniqueness_scores.append(result['uniqueness'])
+                
+                if is_unique:
+                    save_result({
+                        'combination_id': combo_index + 1,
+                        'timestamp': datetime.now().isoformat(),
+                        'is_unique': True,
+                        'user_agents': combination['user_agents'],
+                        'screen_resolutions': combination['screen_resolutions'][0],
+                        'timezones': combination['timezones'],
+                        'languages': combination['languages'],
+                        'platforms': combination['platforms'],
+                        'test_results_json': _dumps(results)
+                    })
+                    log.info("   ✅ UNIQUE combination found! (Total unique: %d)", unique_count)
+                else:
+                    log.info("   ❌ Not unique")
+                
+                # Small delay between tests to be respectful
+                await asyncio.sleep(1)
+            
+            # A fixed pool of workers drains the queue, so only max_concurrent
+            # tasks exist however many combinations there are
+            queue = asyncio.Queue()
+            for i in range(len(combinations)):
+                queue.put_nowait(i)
+            
+            async def worker(context):
+                while not queue.empty():
+                    i = queue.get_nowait()
+                    try:
+                        await test_single_combination(context, i, combinations[i])
+                    except Exception as e:
+                        log.warning("  ❌ Error with combination %d: %s", i + 1, e)
+                    try:
+                        await reset_context(context, site_origins)
+                    except Exception as e:
+                        log.warning("  ❌ Error resetting context after combination %d: %s", i + 1, e)
+            
+            # Run all tests
+            try:
+                await asyncio.gather(*(worker(context) for context in contexts))
+            finally:
+                if csvfile is not None:
+                    csvfile.close()
+                # Buffered progress lines go out before the summary
+                for handler in log.handlers:
+                    handler.flush()
             
             await browser.close()
         
-        # Save results
-        await self.save_results(unique_combinations)
+        if unique_count:
+            print(f"💾 Saved {unique_count} unique combinations to {csv_filename}")
+        else:
+            print("❌ No unique combinations found to save")
         
         print(f"\n🎉 Testing completed!")
         print(f"📊 Total combinations tested: {len(combinations)}")
-        print(f"✅ Unique combinations found: {len(unique_combinations)}")
+        print(f"✅ Unique combinations found: {unique_count}")
         print(f"📁 Results saved to unique_fingerprints.csv")
-    
-    async def save_results(self, unique_combinations):
-        """Save unique combinations to CSV"""
-        if not unique_combinations:
-            print("❌ No unique combinations found to save")
-            return
-        
-        # Prepare CSV data
-        csv_filename = f"unique_fingerprints_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
-                'combination_id', 'timestamp', 'is_unique',
-                'user_agents', 'screen_resolutions', 'timezones', 
-                'languages', 'platforms', 'test_results_json'
-            ]
-            
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for combo in unique_combinations:
-                row = {
-                    'combination_id': combo['combination_id'],
-                    'timestamp': combo['timestamp'],
-                    'is_unique': combo['is_unique'],
-                    'user_agents': combo['user_agents'],
-                    'screen_resolutions': combo['screen_resolutions'],
-                    'timezones': combo['timezones'],
-                    'languages': combo['languages'],
-                    'platforms': combo['platforms'],
-                    'test_results_json': json.dumps(combo['test_results'])
-                }
-                writer.writerow(row)
-        
-        print(f"💾 Saved {len(unique_combinations)} unique combinations to {csv_filename}")
 
 # Main execution
 if __name__ == "__main__":
+    # Progress lines are buffered and written in batches; warnings flush at once
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(logging.handlers.MemoryHandler(200, flushLevel=logging.WARNING, target=stream))
+    log.propagate = False
     tester = FingerprintTester()
     
     # Configuration